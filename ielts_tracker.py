@@ -2,12 +2,17 @@ import tkinter as tk
 from tkinter import ttk, messagebox
 import pandas as pd
 import os
+import csv
+import functools
 from datetime import datetime
-import matplotlib.pyplot as plt
 import numpy as np
 
 # ===== CONFIG =====
 CSV_FILE = "ielts_progress.csv"
+CSV_COLUMNS = [
+    "date", "time", "book", "test", "module", "part",
+    "question_type", "total_questions", "correct", "minutes", "avg_time_per_q"
+]
 
 # Listening question types (including your rename and two-facts)
 LISTENING_TYPES = [
@@ -64,40 +69,99 @@ BAND_MAP = {
     39: 9.0, 40: 9.0,
 }
 
+# Dense lookup table of BAND_MAP, indexed by raw score 0-40
+BAND_LUT = np.zeros(41)
+for _score, _band in BAND_MAP.items():
+    BAND_LUT[_score] = _band
+
 
 # ===== CSV Setup =====
 if not os.path.exists(CSV_FILE):
-    df = pd.DataFrame(columns=[
-        "date", "time", "book", "test", "module", "part",
-        "question_type", "total_questions", "correct", "minutes", "avg_time_per_q"
-    ])
+    df = pd.DataFrame(columns=CSV_COLUMNS)
     df.to_csv(CSV_FILE, index=False)
 
 # ===== Helpers =====
+# Column dtypes used when reading the CSV (skips type inference, smaller frame)
+_DTYPES = {
+    "book": "int8", "test": "int8", "part": "float64",
+    "module": "category", "question_type": "category",
+    "total_questions": "int16", "correct": "int16",
+    "minutes": "float64", "avg_time_per_q": "float64",  # rewritten on delete, keep full precision
+    "time": "string",
+}
+
+# Fixed categories so module/question_type filters and groupbys work on codes
+_MODULES = ["Listening", "Reading"]
+_QUESTION_TYPES = list(dict.fromkeys(LISTENING_TYPES + READING_TYPES))
+
+# Last parsed CSV, reused while the file is unchanged on disk
+_cache = {"stamp": None, "df": None}
+
 def load_data():
-    return pd.read_csv(CSV_FILE)
+    st = os.stat(CSV_FILE)
+    stamp = (st.st_mtime_ns, st.st_size)
+    if _cache["stamp"] == stamp:
+        return _cache["df"].copy()
+    df = pd.read_csv(CSV_FILE, dtype=_DTYPES, parse_dates=["date"], float_precision="round_trip")
+    # Older files store parts as "1.0", newer ones as "1"; both read as the same number
+    df["part"] = df["part"].astype("Int8")
+    # Keep any modules/question types not in the lists (e.g. older names),
+    # otherwise they would turn into NaN and be lost on the next save
+    extra = [m for m in df["module"].cat.categories if m not in _MODULES]
+    df["module"] = df["module"].astype(pd.CategoricalDtype(_MODULES + extra))
+    extra = [q for q in df["question_type"].cat.categories if q not in _QUESTION_TYPES]
+    df["question_type"] = df["question_type"].astype(pd.CategoricalDtype(_QUESTION_TYPES + extra))
+    # Hour and minute of day, parsed once from "HH:MM" (or "H:MM");
+    # unparseable times are left as <NA> instead of failing the load
+    hm = df["time"].str.extract(r"(\d{1,2}):(\d{2})").astype("Int8")
+    df["hour"] = hm[0]
+    df["minute"] = hm[1]
+    _cache.update(stamp=stamp, df=df)
+    return df.copy()
+
+def append_rows(rows):
+    """Append records (dicts keyed by CSV_COLUMNS) to the CSV in one write."""
+    # If the last line has no line ending (e.g. after a hand edit), add one so
+    # the first new record doesn't get joined onto it
+    with open(CSV_FILE, "rb") as f:
+        f.seek(0, os.SEEK_END)
+        needs_newline = False
+        if f.tell() > 0:
+            f.seek(-1, os.SEEK_END)
+            needs_newline = f.read(1) not in (b"\n", b"\r")
+    with open(CSV_FILE, "a", newline="", encoding="utf-8") as f:
+        if needs_newline:
+            f.write(os.linesep)
+        # Match pandas' to_csv line endings so the file stays consistent
+        csv.DictWriter(f, fieldnames=CSV_COLUMNS, lineterminator=os.linesep).writerows(rows)
 
 def save_data(df):
-    df.to_csv(CSV_FILE, index=False)
+    # Write only the stored columns, not the ones derived in load_data
+    df[CSV_COLUMNS].to_csv(CSV_FILE, index=False)
+    _cache["stamp"] = None
 
 def get_band(score):
     """Convert raw correct count (int) to band score float."""
-    # Clip to 40 max
-    score = int(score)
-    if score > 40:
-        score = 40
-    if score < 0:
-        score = 0
-    return BAND_MAP.get(score, 0.0)
+    # Clip to 0-40
+    return float(BAND_LUT[max(0, min(40, int(score)))])
+
+@functools.lru_cache(maxsize=None)
+def _hour_colors():
+    """RGBA color for each hour 0-23, built on first use so matplotlib loads lazily."""
+    import matplotlib.pyplot as plt
+    cmap = plt.get_cmap('RdYlGn_r')  # reversed RdYlGn: green=0, red=23
+    return cmap(np.arange(24) / 23)
 
 def time_to_color(hour):
-    """Convert hour 0-23 to a color from green (morning) to red (night)."""
-    cmap = plt.cm.get_cmap('RdYlGn_r')  # reversed RdYlGn: green=0, red=23
-    return cmap(hour / 23)
+    """Convert hour 0-23 (or an array of hours) to a color from green (morning) to red (night)."""
+    return _hour_colors()[np.clip(np.asarray(hour, dtype=np.intp), 0, 23)]
 
 def book_test_order(book, test):
-    """Helper to sort book-test in proper order (e.g., 15-1 before 16-4)."""
-    return int(book)*10 + int(test)
+    """Helper to sort book-test in proper order (e.g., 15-1 before 16-4).
+
+    Works element-wise on the book and test columns.
+    """
+    return book.astype(int)*10 + test.astype(int)
 
 # ===== GUI =====
 root = tk.Tk()
@@ -155,19 +219,15 @@ def add_exam():
                 messagebox.showerror("Error", "Correct answers cannot exceed total questions.")
                 return
 
-            now = datetime.now()
-            date_str = now.strftime("%Y-%m-%d")
-            time_str = now.strftime("%H:%M")
+            date_str, time_str = datetime.now().strftime("%Y-%m-%d %H:%M").split(" ")
 
-            df = load_data()
-            new_row = {
+            # Append only the new record instead of rewriting the whole CSV
+            append_rows([{
                 "date": date_str, "time": time_str, "book": book, "test": test,
                 "module": module, "part": part, "question_type": qtype,
                 "total_questions": total_q, "correct": correct,
                 "minutes": minutes, "avg_time_per_q": avg_time
-            }
-            df = pd.concat([df, pd.DataFrame([new_row])], ignore_index=True)
-            save_data(df)
+            }])
             messagebox.showinfo("Saved", "Exam record added successfully!")
             win.destroy()
         except Exception as e:
@@ -239,50 +299,57 @@ def delete_exam():
     listbox = tk.Listbox(win, width=60)
     listbox.pack(padx=10, pady=10)
 
-    for _, row in df.iterrows():
-        desc = f"{row['book']}-{row['test']} {row['module']} Part:{row['part'] if row['part'] else '-'} {row['question_type']} Correct:{row['correct']}/{row['total_questions']}"
-        listbox.insert(tk.END, desc)
+    cols = ["book", "test", "module", "part", "question_type", "correct", "total_questions"]
+    descs = [
+        f"{book}-{test} {module} Part:{part if pd.notna(part) else '-'} {qtype} Correct:{correct}/{total}"
+        for book, test, module, part, qtype, correct, total in df[cols].itertuples(index=False, name=None)
+    ]
+    # Insert all entries with a single Tk call
+    listbox.insert(tk.END, *descs)
 
     tk.Button(win, text="Delete Selected", command=delete_selected).pack(pady=5)
 
 # ===== View Stats =====
 def view_stats():
+    # Imported here so adding/deleting records doesn't pay matplotlib's startup cost
+    import matplotlib.pyplot as plt
+
     df = load_data()
     if df.empty:
         messagebox.showerror("Error", "No data available.")
         return
 
+    # Split by module once and share it between the plots and the stats table
+    is_listening = (df["module"] == "Listening").to_numpy()
+    is_reading = (df["module"] == "Reading").to_numpy()
+    df_listening = df.loc[is_listening]
+    df_reading = df.loc[is_reading]
+
     def plot_overall(module):
-        df_mod = df[df["module"] == module].copy()
-        if df_mod.empty:
+        df_mod = df_listening if module == "Listening" else df_reading
+        if len(df_mod) == 0:
             messagebox.showerror("Error", f"No data for {module}")
             return
 
         # Create book_test string and sort by book_test order
-        df_mod["book_test"] = df_mod["book"].astype(str) + "-" + df_mod["test"].astype(str)
+        # (kept as separate keys so the shared frame isn't copied or modified)
+        book_test = (df_mod["book"].astype(str) + "-" + df_mod["test"].astype(str)).rename("book_test")
+        sort_key = book_test_order(df_mod["book"], df_mod["test"]).rename("sort_key")
         # Sum correct & total per book_test
-        grouped = df_mod.groupby("book_test").agg({"correct": "sum", "total_questions": "sum"}).reset_index()
+        grouped = df_mod.groupby([book_test, sort_key]).agg({"correct": "sum", "total_questions": "sum"}).reset_index()
 
         # Calculate band scores per book_test from summed correct answers
-        grouped["band_score"] = grouped["correct"].apply(get_band)
+        grouped["band_score"] = BAND_LUT[np.clip(grouped["correct"].to_numpy().astype(np.intp), 0, 40)]
 
         # Sort by book-test numeric order
-        grouped["sort_key"] = grouped["book_test"].apply(lambda x: book_test_order(*x.split("-")))
         grouped = grouped.sort_values("sort_key")
 
         # Plot
         plt.figure(figsize=(10, 5))
-        hours = []
-        colors = []
-        for bt in grouped["book_test"]:
-            # find first record time in that book-test for color (earliest time)
-            times = df_mod[df_mod["book_test"] == bt]["time"].values
-            if len(times) > 0:
-                hour = int(times[0].split(":")[0])
-            else:
-                hour = 12
-            hours.append(hour)
-            colors.append(time_to_color(hour))
+        # first record time in each book-test for color (earliest time)
+        # (noon if a book-test has no readable time)
+        hours = df_mod.groupby(book_test)["hour"].first().reindex(grouped["book_test"]).fillna(12).to_numpy(dtype=int)
+        colors = time_to_color(hours)
 
         # Line plot with dots, color by time
         x = range(len(grouped))
@@ -306,41 +373,35 @@ def view_stats():
         plt.show()
 
     def plot_listening_part_by_part():
-        df_list = df[df["module"] == "Listening"].copy()
-        if df_list.empty:
+        df_list = df_listening
+        if len(df_list) == 0:
             messagebox.showerror("Error", "No Listening data.")
             return
         # Sum correct & total per book-test-part
-        df_list["book_test"] = df_list["book"].astype(str) + "-" + df_list["test"].astype(str)
-        grouped = df_list.groupby(["book_test", "part"]).agg({
+        book_test = (df_list["book"].astype(str) + "-" + df_list["test"].astype(str)).rename("book_test")
+        grouped = df_list.groupby([book_test, "part"]).agg({
             "correct": "sum",
             "total_questions": "sum"
         }).reset_index()
 
         # Calculate band per part (sum correct converted to band, assuming max 10 per part for example)
-        # Since total questions vary, use percent correct scaled to 40 max, approx
-        grouped["percent"] = grouped["correct"] / grouped["total_questions"]
-        grouped["scaled_score"] = grouped["percent"] * 10  # scale to 10 for band mapping (approximate)
-        grouped["band_score"] = grouped["scaled_score"].apply(lambda x: 5 + (4 * x / 10))  # linear 5-9 scale approx
+        # Since total questions vary, map percent correct onto a linear 5-9 scale (approximate)
+        grouped["band_score"] = 5.0 + 4.0 * (
+            grouped["correct"].to_numpy(dtype=np.float32) / grouped["total_questions"].to_numpy(dtype=np.float32)
+        )
 
         # Plot parts 1 to 4 lines
         plt.figure(figsize=(12, 6))
         parts = sorted(grouped["part"].unique())
         colors = ["blue", "green", "orange", "purple"]
-        book_tests = sorted(grouped["book_test"].unique(), key=lambda x: book_test_order(*x.split("-")))
+        ordered = df_list[["book", "test"]].drop_duplicates().sort_values(["book", "test"])
+        book_tests = (ordered["book"].astype(str) + "-" + ordered["test"].astype(str)).tolist()
         x_ticks = range(len(book_tests))
 
+        # Align y data by book_test, missing book-test/part pairs become nan
+        pivot = grouped.pivot(index="book_test", columns="part", values="band_score").reindex(book_tests)
         for i, p in enumerate(parts):
-            data_p = grouped[grouped["part"] == p]
-            # Align y data by book_test, fill missing with nan
-            y_vals = []
-            for bt in book_tests:
-                row = data_p[data_p["book_test"] == bt]
-                if len(row) == 0:
-                    y_vals.append(np.nan)
-                else:
-                    y_vals.append(row["band_score"].values[0])
-            plt.plot(x_ticks, y_vals, marker='o', label=f"Part {p}", color=colors[i])
+            plt.plot(x_ticks, pivot[p].to_numpy(), marker='o', label=f"Part {p}", color=colors[i])
 
         plt.xticks(x_ticks, book_tests, rotation=45)
         plt.ylim(5, 9)
@@ -354,7 +415,11 @@ def view_stats():
 
     def show_stats_table():
         # We create a table window showing question types stats
-        df_stats = load_data()
+        # Reading only counts records with minutes entered; rows without a
+        # question type are skipped (groupby keeps NaN keys for Reading's part)
+        has_minutes = df["minutes"].notna().to_numpy()
+        has_qtype = df["question_type"].notna().to_numpy()
+        df_stats = df.loc[(is_listening | (is_reading & has_minutes)) & has_qtype]
         if df_stats.empty:
             messagebox.showerror("Error", "No data to show.")
             return
@@ -378,40 +443,30 @@ def view_stats():
         tree.column("Accuracy", width=80, anchor='center')
         tree.column("AvgTime", width=90, anchor='center')
 
-        # Calculate stats grouped by module and question_type
-        for module in ["Listening", "Reading"]:
-            df_mod = df_stats[df_stats["module"] == module]
-            if module == "Reading":
-                df_mod = df_mod[df_mod["minutes"].notna()]
-
-            if df_mod.empty:
-                continue
-            # Group by question type and part for Listening, only question type for Reading
+        # Calculate stats grouped by module, question type and part in one pass
+        # (Reading has no part)
+        g = df_stats.groupby(["module", "question_type", "part"], dropna=False, observed=True).agg(
+            correct=("correct", "sum"),
+            total=("total_questions", "sum"),
+            avg_t=("avg_time_per_q", "mean"),  # will be nan for Listening
+        ).reset_index()
+        # Skip if total answered = 0
+        g = g[g["total"] > 0]
+        g["acc"] = 100 * g["correct"] / g["total"]
+
+        rows = []
+        for module, qtype, part, correct, total, avg_t, acc in g.itertuples(index=False, name=None):
             if module == "Listening":
-                group_cols = ["question_type", "part"]
+                qtype_str = f"{qtype} Part {part}"
+                avg_str = "-"
             else:
-                group_cols = ["question_type"]
-
-            grouped = df_mod.groupby(group_cols).agg({
-                "correct": "sum",
-                "total_questions": "sum",
-                "avg_time_per_q": "mean"  # will be nan for Listening
-            }).reset_index()
-
-            for _, row in grouped.iterrows():
-                correct = row["correct"]
-                total = row["total_questions"]
-                acc = 100 * correct / total if total > 0 else 0
-                avg_t = row["avg_time_per_q"] if module == "Reading" else "-"
-                qtype = row["question_type"]
-                part_str = f" Part {row['part']}" if module == "Listening" else ""
-                # Skip if total answered = 0
-                if total == 0:
-                    continue
-                tree.insert("", "end", values=(
-                    module, qtype + part_str, int(correct), int(total), f"{acc:.1f}%", f"{avg_t:.2f}" if avg_t != "-" else "-"
-                ))
+                qtype_str = qtype
+                avg_str = f"{avg_t:.2f}"
+            rows.append((module, qtype_str, int(correct), int(total), f"{acc:.1f}%", avg_str))
 
+        # Fill the tree before packing it so Tk doesn't redraw after every insert
+        for r in rows:
+            tree.insert("", "end", values=r)
         tree.pack(expand=True, fill=tk.BOTH)
 
     def choose_plot():